@@ -1,56 +1,197 @@
 # backtest.py
 import os
-import sys
-import queue
+import argparse
+import logging
 
-from event_system import MarketEvent, SignalEvent, OrderEvent, FillEvent, event_queue
-from engine_components import DataHandler, Portfolio, LoggingHandler, ExecutionHandler
+import numpy as np
+
+from event_system import SignalEventView, FillEvent, event_queue, SIGNAL_LONG, SIGNAL_EXIT, OHLCV_COLUMNS
+from engine_components import DataHandler, Portfolio, LoggingHandler, ExecutionHandler, LOG_TIMESTAMP_FORMAT
 from statistics import Statistics
-from strategies.buy_and_hold_strategy import BuyAndHoldStrategy
+from numba_compat import njit
+from strategies.buy_and_hold_strategy import make_buy_and_hold_strategy
+
+def run_event_loop(data_handler, strategies, portfolio, execution_handler, logger) -> None:
+    """
+    Drives the backtest one bar at a time through the central event queue.
+    Required for strategies that carry state from one bar to the next.
+    :param strategies: The strategies to run side by side on the same bars.
+    """
+    # Bound methods are looked up once here rather than on every bar. Only
+    # strategies with wants_bars get a per-bar callback.
+    callbacks = [(s.calculate_signals, s.flush_signals) for s in strategies if s.wants_bars]
+    stream_next_bar = data_handler.stream_next_bar
+    next_event = event_queue.popleft
+
+    # Handlers read the current bar from the enclosing scope (bar_data below).
+    if not callbacks:
+        def on_market(event):
+            pass
+    elif len(callbacks) == 1:
+        # The usual single-strategy run: call it directly, with no loop.
+        [(calculate_signals, flush_signals)] = callbacks
+        def on_market(event):
+            calculate_signals(event.timestamp, event.bar_data.ohlcv)
+            flush_signals()
+    else:
+        def on_market(event):
+            timestamp, ohlcv = event.timestamp, event.bar_data.ohlcv
+            for calculate_signals, flush_signals in callbacks:
+                calculate_signals(timestamp, ohlcv)
+                flush_signals()
+
+    def on_signal(event):
+        logger.on_signal(event, timestamp_str=bar_data.timestamp_str)
+        portfolio.on_signal(event)
+
+    def on_order(event):
+        execution_handler.execute_order(event, bar_data, data_handler.bar_index)
+
+    def on_fill(event):
+        portfolio.on_fill(event)
+        logger.on_fill(event)
+
+    # One dict lookup per event instead of walking an if/elif chain of string compares.
+    handlers = {'MARKET': on_market, 'SIGNAL': on_signal, 'ORDER': on_order, 'FILL': on_fill}
+
+    timestamp, bar_data = stream_next_bar()
+    if timestamp is not None:
+        for strategy in strategies:
+            strategy.on_start(timestamp, bar_data)
+    while timestamp is not None:
+        while True:
+            try:
+                event = next_event()
+            except IndexError:
+                break
+            handlers[event.type](event)
+        timestamp, bar_data = stream_next_bar()
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _simulate_fills(close, signals, slip_draws, slippage_pct, commission_rate, quantity, initial_capital):
+    """
+    Walks the bars once, applying the Portfolio rules (buy when flat on LONG,
+    sell everything on EXIT) and the ExecutionHandler cost model. Returns the
+    bar index, side (+1 BUY / -1 SELL), fill price and commission of each fill,
+    the cash after each fill, and whether the run ends long.
+    """
+    n = close.size
+    fill_bars = np.empty(n, dtype=np.int64)
+    sign = np.empty(n)
+    fill_price = np.empty(n)
+    commission = np.empty(n)
+    cash = np.empty(n)
+    n_fills = 0
+    long = False
+    c = initial_capital
+    for i in range(n):
+        s = signals[i]
+        if s == SIGNAL_LONG and not long:
+            side = 1.0
+        elif s == SIGNAL_EXIT and long:
+            side = -1.0
+        else:
+            continue
+        long = not long
+        price = close[i] + close[i] * slippage_pct * slip_draws[i] * side
+        comm = price * quantity * commission_rate
+        c -= side * price * quantity + comm
+        fill_bars[n_fills] = i
+        sign[n_fills] = side
+        fill_price[n_fills] = price
+        commission[n_fills] = comm
+        cash[n_fills] = c
+        n_fills += 1
+    return (fill_bars[:n_fills], sign[:n_fills], fill_price[:n_fills],
+            commission[:n_fills], cash[:n_fills], long)
+
+def run_vectorized(data_handler, strategy, portfolio, execution_handler, logger) -> int:
+    """
+    Drives the backtest over the whole history in one pass. The strategy returns
+    a signal code per bar, and the Portfolio rules and cost model are applied by
+    the compiled _simulate_fills kernel. Only the resulting signals and fills are
+    materialized as events, for logging. Returns the number of fills.
+    """
+    data = data_handler.data
+    signals = np.ascontiguousarray(strategy.calculate_signals_batch(
+        data.index.as_unit('ns').asi8, data[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+    ), dtype=np.int8)
+    close = data['Close'].to_numpy(dtype=np.float64)
+    quantity = portfolio.order_quantity
+
+    fill_bars, sign, fill_price, commission, cash, ends_long = _simulate_fills(
+        close, signals, execution_handler.slippage_draws(np.arange(close.size)),
+        execution_handler.slippage_pct, execution_handler.commission_rate,
+        float(quantity), float(portfolio.initial_capital)
+    )
+
+    signal_bars = np.flatnonzero(signals)
+    signal_ts_str = data.index[signal_bars].strftime(LOG_TIMESTAMP_FORMAT)
+    for i, ts_str in zip(signal_bars, signal_ts_str):
+        logger.on_signal(SignalEventView(signals, data.index, i, strategy.symbol), timestamp_str=ts_str)
+    for i, s, price, comm in zip(fill_bars, sign, fill_price, commission):
+        logger.on_fill(FillEvent(
+            timestamp=data.index[i],
+            symbol=strategy.symbol,
+            direction='BUY' if s > 0 else 'SELL',
+            quantity=quantity,
+            fill_price=price,
+            commission=comm
+        ))
+
+    if cash.size:
+        portfolio.cash = cash[-1]
+    if ends_long:
+        portfolio.positions[strategy.symbol] = quantity
+    return fill_bars.size
 
 def main():
+    parser = argparse.ArgumentParser(description="Terminal Backtesting Engine")
+    parser.add_argument(
+        '--event-loop', action='store_true',
+        help="Run bar by bar through the event queue (for strategies that need state)."
+    )
+    parser.add_argument(
+        '--verbose', action='store_true',
+        help="Print every order and fill as it happens (slows down long runs)."
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    if args.verbose:
+        # Only the engine's own loggers; third-party DEBUG output (matplotlib etc.) stays off.
+        for name in ('engine_components', 'strategies'):
+            logging.getLogger(name).setLevel(logging.DEBUG)
+
     print("--- Terminal Backtesting Engine ---")
 
     # --- Configuration ---
     run_name = "phase3_advanced_plot"
     symbol = 'RELIANCE.NS'
     initial_capital = 100000.0
-    csv_filepath = os.path.join('data', 'stocks', f'{symbol}.csv')
+    data_filepath = os.path.join('data', 'stocks', f'{symbol}.parquet')
     commission_rate = 0.001
     slippage_pct = 0.0005
-    
+    seed = 42 # Seeds the slippage draws so runs are reproducible
+
     print(f"\nStarting new test run: '{run_name}' on {symbol}")
-    
+
     # --- Initialization ---
-    data_handler = DataHandler(csv_filepath=csv_filepath)
+    data_handler = DataHandler(filepath=data_filepath)
     portfolio = Portfolio(initial_capital=initial_capital)
-    execution_handler = ExecutionHandler(commission_rate=commission_rate, slippage_pct=slippage_pct)
-    strategy = BuyAndHoldStrategy(symbol=symbol, data_handler=data_handler)
+    execution_handler = ExecutionHandler(
+        commission_rate=commission_rate, slippage_pct=slippage_pct, seed=seed
+    )
+    strategy = make_buy_and_hold_strategy(symbol=symbol, data_handler=data_handler)
     logger = LoggingHandler(run_name=run_name)
 
-    # --- Main Event Loop ---
-    while True:
-        timestamp, bar_data = data_handler.stream_next_bar()
-        if timestamp is None:
-            break
-        while not event_queue.empty():
-            try:
-                event = event_queue.get(False)
-            except queue.Empty:
-                break
-            else:
-                if event:
-                    if event.type == 'MARKET':
-                        strategy.calculate_signals(timestamp, bar_data)
-                    elif event.type == 'SIGNAL':
-                        logger.on_signal(event)
-                        portfolio.on_signal(event)
-                    elif event.type == 'ORDER':
-                        execution_handler.execute_order(event, bar_data)
-                    elif event.type == 'FILL':
-                        portfolio.on_fill(event)
-                        logger.on_fill(event)
-    
+    # --- Main Loop ---
+    if args.event_loop:
+        run_event_loop(data_handler, [strategy], portfolio, execution_handler, logger)
+    else:
+        n_fills = run_vectorized(data_handler, strategy, portfolio, execution_handler, logger)
+        print(f"Vectorized run complete: {n_fills} fills over {len(data_handler.data)} bars.")
+    logger.flush()
+
     print("\n--- Backtest Finished: Generating Report & Chart ---")
 
     # --- Post-Backtest Analysis ---
@@ -1,7 +1,8 @@
 # data_updater.py
 import yfinance as yf
 import os
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # List of NIFTY 50 tickers for Yahoo Finance (as of June 2024)
 # The '.NS' suffix is crucial for National Stock Exchange listings.
@@ -22,10 +23,63 @@ NIFTY50_TICKERS = [
 # Define the data directory
 DATA_DIR = 'data/stocks'
 
+# Downloads run in parallel, but we stay polite to Yahoo's servers by starting
+# at most one request every REQUEST_INTERVAL seconds across all threads.
+MAX_WORKERS = 8
+REQUEST_INTERVAL = 0.2
+_request_slot = threading.Semaphore(1)
+
+def _wait_for_request_slot():
+    """
+    Rate limit shared by all worker threads: takes the single request slot and
+    hands it back only after REQUEST_INTERVAL seconds, so downloads start at
+    most once per interval no matter how many threads are waiting.
+    """
+    _request_slot.acquire()
+    threading.Timer(REQUEST_INTERVAL, _request_slot.release).start()
+
+def _fetch_one(ticker: str) -> bool:
+    """
+    Downloads, cleans and saves the daily history of a single ticker as Parquet.
+    Returns False if Yahoo returned no data for it.
+    """
+    _wait_for_request_slot()
+
+    # Download data from 2010 to the present day.
+    # yf.download keeps its results in module-level state shared by all calls,
+    # so it is not safe to call from several threads; a Ticker per call is.
+    data = yf.Ticker(ticker).history(
+        start='2010-01-01',
+        end=None, # None means up to the latest available data
+        interval='1d' # Daily data
+    )
+
+    if data.empty:
+        return False
+
+    # Keep the OHLCV columns the DataHandler reads, on a tz-naive Date index.
+    data = data[['Open', 'High', 'Low', 'Close', 'Volume']]
+    data.index = data.index.tz_localize(None)
+
+    # CRITICAL: Clean the data by forward-filling missing values
+    # This prevents gaps in our data which can break the backtester
+    data.ffill(inplace=True)
+    data.bfill(inplace=True)
+
+    # Define the output path
+    output_path = os.path.join(DATA_DIR, f"{ticker}.parquet")
+
+    # Save the data as a compressed, typed, columnar Parquet file
+    data.to_parquet(output_path, compression='zstd', index=True)
+    return True
+
 def download_nifty50_data():
     """
     Downloads historical daily data for all NIFTY 50 stocks
-    and saves them as individual CSV files.
+    and saves them as individual Parquet files.
+
+    The downloads are network-bound, so they run on a pool of MAX_WORKERS
+    threads (yfinance releases the GIL while waiting on the network).
     """
     print("--- Starting Download of NIFTY 50 Historical Data ---")
     
@@ -34,48 +88,27 @@ def download_nifty50_data():
     
     failed_tickers = []
 
-    for i, ticker in enumerate(NIFTY50_TICKERS):
-        print(f"Downloading ({i+1}/{len(NIFTY50_TICKERS)}): {ticker}...")
-        
-        try:
-            # Download data from 2010 to the present day
-            data = yf.download(
-                ticker,
-                start='2010-01-01',
-                end=None, # None means up to the latest available data
-                interval='1d', # Daily data
-                progress=False # Suppress the progress bar for a cleaner log
-            )
-
-            if data.empty:
-                print(f"No data found for {ticker}. Skipping.")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {executor.submit(_fetch_one, ticker): ticker for ticker in NIFTY50_TICKERS}
+        for i, future in enumerate(as_completed(futures)):
+            ticker = futures[future]
+            try:
+                saved = future.result()
+            except Exception as e:
+                print(f"!!! FAILED to download {ticker}: {e}")
                 failed_tickers.append(ticker)
                 continue
 
-            # CRITICAL: Clean the data by forward-filling missing values
-            # This prevents gaps in our data which can break the backtester
-            data.ffill(inplace=True)
-            data.bfill(inplace=True)
-
-            # Define the output path
-            output_path = os.path.join(DATA_DIR, f"{ticker}.csv")
-            
-            # Save the data to a CSV file
-            data.to_csv(output_path)
-            
-            print(f"Successfully saved to {output_path}")
-
-        except Exception as e:
-            print(f"!!! FAILED to download {ticker}: {e}")
-            failed_tickers.append(ticker)
-        
-        # Be polite to Yahoo's servers by adding a small delay
-        time.sleep(1)
+            if saved:
+                print(f"({i+1}/{len(NIFTY50_TICKERS)}) Successfully saved {ticker}")
+            else:
+                print(f"({i+1}/{len(NIFTY50_TICKERS)}) No data found for {ticker}. Skipping.")
+                failed_tickers.append(ticker)
 
     print("\n--- Data Download Complete ---")
     if failed_tickers:
         print("\nThe following tickers failed to download:")
-        for ticker in failed_tickers:
+        for ticker in sorted(failed_tickers, key=NIFTY50_TICKERS.index):
             print(f"- {ticker}")
 
 if __name__ == "__main__":
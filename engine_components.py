@@ -1,45 +1,176 @@
 # engine_components.py
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import csv
+import logging
 import os # <-- THE MISSING IMPORT
+from typing import NamedTuple
 
-from event_system import MarketEvent, SignalEvent, OrderEvent, FillEvent, event_queue
+from event_system import MarketEvent, SignalEvent, OrderEvent, FillEvent, event_queue, OHLCV_COLUMNS
+
+# Per-event messages go through logging at DEBUG level rather than print(), so
+# they cost a single level check unless the run is started with --verbose.
+log = logging.getLogger(__name__)
+
+class Bar(NamedTuple):
+    """
+    A single OHLCV bar, as handed to strategies and the ExecutionHandler.
+    The prices are a row view into the DataHandler's per-chunk OHLCV matrix
+    rather than a pandas Series, so reading them is plain positional indexing.
+    """
+    timestamp: np.datetime64
+    ohlcv: np.ndarray # float64, shape (5,), in OHLCV_COLUMNS order
+    timestamp_str: str # The timestamp preformatted as '%Y-%m-%d %H:%M:%S' for the logs
+
+    @property
+    def open(self) -> float:
+        return self.ohlcv[0]
+
+    @property
+    def high(self) -> float:
+        return self.ohlcv[1]
+
+    @property
+    def low(self) -> float:
+        return self.ohlcv[2]
+
+    @property
+    def close(self) -> float:
+        return self.ohlcv[3]
+
+    @property
+    def volume(self) -> float:
+        return self.ohlcv[4]
+
+# Column types for market data. Money (cash, equity, fill prices) stays float64.
+PRICE_TYPES = {'Open': pa.float32(), 'High': pa.float32(), 'Low': pa.float32(), 'Close': pa.float32(), 'Volume': pa.int64()}
+PRICE_DTYPES = {col: pa_type.to_pandas_dtype() for col, pa_type in PRICE_TYPES.items()}
+# Rows per batch when streaming a Parquet file.
+PARQUET_BATCH_ROWS = 65536
+
+# Timestamp format used in the signal log.
+LOG_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Record layout of the binary trade log: one fixed-size record per fill, so the
+# file can be memory-mapped straight back into an array with no parsing.
+# ts is the execution time in int64 nanoseconds; dir is TRADE_BUY or TRADE_SELL.
+TRADE_DTYPE = np.dtype([('ts', 'i8'), ('sym', 'S16'), ('dir', 'i1'), ('qty', 'i4'), ('px', 'f8'), ('comm', 'f8')])
+TRADE_BUY, TRADE_SELL = 0, 1
+
+# LoggingHandler writes a log out once this many entries are buffered, so long
+# runs hold a bounded amount in memory and still pay one write per batch.
+LOG_FLUSH_THRESHOLD = 256
 
 class DataHandler:
     """
-    DataHandler reads market data from a CSV file and provides it to the system
-    bar by bar, placing a MarketEvent on the queue for each bar.
+    DataHandler reads market data from a Parquet or CSV file and provides it to
+    the system bar by bar, placing a MarketEvent on the queue for each bar.
+
+    The file is read lazily in batches (PARQUET_BATCH_ROWS rows for Parquet,
+    `block_size` bytes through pyarrow's multithreaded CSV reader otherwise), so
+    bars are streamed before the whole file has been read and only the chunks
+    reached so far are held in memory. The full history is still available as `data`.
+
+    Prices are stored as float32, which is ample precision for OHLC quotes and
+    halves the memory traffic of everything that scans the price columns.
     """
-    def __init__(self, csv_filepath: str):
-        self.csv_filepath = csv_filepath
-        self.data = pd.read_csv(
-            csv_filepath,
-            header=0,
-            skiprows=[1, 2],
-            index_col=0,
-            parse_dates=True
-        )
-        self.data.index.name = 'Date'
-        self._data_generator = self.data.iterrows()
-        print(f"DataHandler initialized for {csv_filepath}. {len(self.data)} rows loaded successfully.")
+    def __init__(self, filepath: str, block_size: int = 1 << 20):
+        self.filepath = filepath
+        if filepath.endswith('.parquet'):
+            # Parquet stores the index (with pandas metadata) and typed columns.
+            self._index_col = None
+            self._batches = iter(pq.ParquetFile(filepath).iter_batches(batch_size=PARQUET_BATCH_ROWS))
+        else:
+            # The first column holds the dates; its header varies ('Date', 'Price', ...).
+            with open(filepath, newline='') as f:
+                self._index_col = next(csv.reader(f))[0]
+            self._batches = iter(pacsv.open_csv(
+                filepath,
+                # yfinance writes two extra header rows (Ticker, Date) below the column names.
+                read_options=pacsv.ReadOptions(skip_rows_after_names=2, block_size=block_size),
+                convert_options=pacsv.ConvertOptions(
+                    column_types={self._index_col: pa.timestamp('ns'), **PRICE_TYPES}
+                )
+            ))
+        self._chunks = []
+        self._data = None
+        # Cursor into the column arrays of the chunk currently being streamed.
+        # bar_index is the position of the last streamed bar in the whole file.
+        self.bar_index = -1
+        self._chunk_pos = -1
+        self._i = 0
+        self._n = 0
+        print(f"DataHandler initialized for {filepath}. Data is streamed in batches.")
 
-    def stream_next_bar(self) -> tuple[pd.Timestamp, pd.Series] | tuple[None, None]:
+    def _load_chunk(self) -> bool:
+        """ Parses the next chunk of the file. Returns False once the file is exhausted. """
         try:
-            timestamp, bar_data = next(self._data_generator)
+            batch = next(self._batches)
         except StopIteration:
-            print("End of data stream reached.")
-            return None, None
+            return False
+        chunk = batch.to_pandas()
+        if self._index_col is not None:
+            chunk = chunk.set_index(self._index_col)
         else:
-            event_queue.put(MarketEvent())
-            return timestamp, bar_data
+            # Parquet columns keep the dtypes they were written with.
+            chunk = chunk.astype(PRICE_DTYPES)
+        chunk.index.name = 'Date'
+        self._chunks.append(chunk)
+        return True
+
+    def _advance_chunk(self) -> bool:
+        """
+        Moves the cursor to the next non-empty chunk and caches its columns as
+        NumPy arrays. Returns False at the end of the data.
+        """
+        while self._chunk_pos + 1 < len(self._chunks) or self._load_chunk():
+            self._chunk_pos += 1
+            chunk = self._chunks[self._chunk_pos]
+            if len(chunk):
+                self._ts = chunk.index.values
+                # Format every timestamp of the chunk in one vectorized call.
+                self._ts_str = chunk.index.strftime(LOG_TIMESTAMP_FORMAT).to_numpy()
+                self._ohlcv = chunk[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+                self._i = 0
+                self._n = len(chunk)
+                return True
+        return False
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """ The full price history. Reads any chunks not yet streamed on first access. """
+        if self._data is None:
+            while self._load_chunk():
+                pass
+            self._data = pd.concat(self._chunks) if self._chunks else pd.DataFrame()
+        return self._data
+
+    def stream_next_bar(self) -> tuple[np.datetime64, Bar] | tuple[None, None]:
+        i = self._i
+        if i >= self._n:
+            if not self._advance_chunk():
+                log.debug("End of data stream reached.")
+                return None, None
+            i = 0
+        self._i = i + 1
+        self.bar_index += 1
+        timestamp = self._ts[i]
+        bar = Bar(timestamp, self._ohlcv[i], self._ts_str[i])
+        event_queue.append(MarketEvent(timestamp, bar))
+        return timestamp, bar
 
 class Portfolio:
     """
     The Portfolio class handles the positions and market value of all
     instruments at a resolution of a "bar".
     """
-    def __init__(self, initial_capital: float = 100000.0):
+    def __init__(self, initial_capital: float = 100000.0, order_quantity: int = 10):
         self.initial_capital = initial_capital
         self.cash = initial_capital
+        self.order_quantity = order_quantity
         self.positions = {}
         print(f"Portfolio initialized with Capital: {self.initial_capital:.2f}")
 
@@ -48,11 +179,11 @@ class Portfolio:
             order = OrderEvent(
                 symbol=signal.symbol,
                 order_type='MKT',
-                quantity=10,
+                quantity=self.order_quantity,
                 direction='BUY'
             )
-            event_queue.put(order)
-            print(f"Portfolio generated ORDER: BUY 10 units of {signal.symbol}")
+            event_queue.append(order)
+            log.debug("Portfolio generated ORDER: BUY %s units of %s", self.order_quantity, signal.symbol)
         elif signal.signal_type == 'EXIT' and signal.symbol in self.positions:
             quantity_to_sell = self.positions[signal.symbol]
             order = OrderEvent(
@@ -61,8 +192,8 @@ class Portfolio:
                 quantity=quantity_to_sell,
                 direction='SELL'
             )
-            event_queue.put(order)
-            print(f"Portfolio generated ORDER: SELL {quantity_to_sell} units of {signal.symbol}")
+            event_queue.append(order)
+            log.debug("Portfolio generated ORDER: SELL %s units of %s", quantity_to_sell, signal.symbol)
 
     def on_fill(self, fill: FillEvent) -> None:
         if fill.direction == 'BUY':
@@ -71,7 +202,7 @@ class Portfolio:
         elif fill.direction == 'SELL':
             self.cash += (fill.fill_price * fill.quantity) - fill.commission
             self.positions.pop(fill.symbol, None)
-        print(f"Portfolio updated on FILL: Cash is now {self.cash:.2f}")
+        log.debug("Portfolio updated on FILL: Cash is now %.2f", self.cash)
 
 
 # engine_components.py (LoggingHandler update)
@@ -80,15 +211,20 @@ class LoggingHandler:
     """
     The LoggingHandler is responsible for writing all events (trades and signals)
     to log files for later analysis.
+
+    Trades go to an append-only binary file of TRADE_DTYPE records, which
+    Statistics memory-maps; signals go to a human-readable text log. Both are
+    buffered in memory and appended in batches of LOG_FLUSH_THRESHOLD entries;
+    flush() writes whatever is left and must be called once the backtest has
+    finished.
     """
     def __init__(self, run_name: str, log_dir: str = 'logs'):
         self.log_dir = log_dir
         self.run_name = run_name
         
         # --- Setup for Trade Log ---
-        self.trade_log_path = os.path.join(self.log_dir, f"{self.run_name}_trades.log")
-        with open(self.trade_log_path, 'w') as f:
-            f.write("Execution_Timestamp|Symbol|Action|Quantity|Price|Commission|P/L\n")
+        self.trade_log_path = os.path.join(self.log_dir, f"{self.run_name}_trades.bin")
+        open(self.trade_log_path, 'wb').close()
         print(f"Trade log initialized at: {self.trade_log_path}")
         
         # --- NEW: Setup for Signal Log ---
@@ -97,34 +233,69 @@ class LoggingHandler:
             f.write("Signal_Timestamp|Symbol|Signal_Type|Notes\n")
         print(f"Signal log initialized at: {self.signal_log_path}")
 
+        self._trade_buf = []
+        self._signal_buf = []
+
     def on_fill(self, fill_event: FillEvent) -> None:
-        """ Takes a FillEvent and writes its contents to the trade log. """
-        pnl = 0.0 # Placeholder for now
-        log_line = (
-            f"{fill_event.timestamp.strftime('%Y-%m-%d %H:%M:%S')}|"
-            f"{fill_event.symbol}|"
-            f"{fill_event.direction}|"
-            f"{fill_event.quantity}|"
-            f"{fill_event.fill_price:.2f}|"
-            f"{fill_event.commission:.2f}|"
-            f"{pnl:.2f}\n"
-        )
-        with open(self.trade_log_path, 'a') as f:
-            f.write(log_line)
+        """ Takes a FillEvent and buffers it as a trade log record. """
+        self._trade_buf.append((
+            np.datetime64(fill_event.timestamp, 'ns').astype(np.int64),
+            fill_event.symbol,
+            TRADE_BUY if fill_event.direction == 'BUY' else TRADE_SELL,
+            fill_event.quantity,
+            fill_event.fill_price,
+            fill_event.commission
+        ))
+        if len(self._trade_buf) >= LOG_FLUSH_THRESHOLD:
+            self._flush_trades()
     
     # --- NEW: Method to log signals ---
-    def on_signal(self, signal_event: SignalEvent, notes: str = "") -> None:
-        """ Takes a SignalEvent and writes its contents to the signal log. """
+    def on_signal(self, signal_event: SignalEvent, notes: str = "", timestamp_str: str | None = None) -> None:
+        """
+        Takes a SignalEvent and writes its contents to the signal log.
+        :param timestamp_str: The signal timestamp already formatted (e.g. Bar.timestamp_str),
+                              to skip formatting it per event.
+        """
+        if timestamp_str is None:
+            timestamp_str = pd.Timestamp(signal_event.timestamp).strftime(LOG_TIMESTAMP_FORMAT)
         log_line = (
-            f"{signal_event.timestamp.strftime('%Y-%m-%d %H:%M:%S')}|"
+            f"{timestamp_str}|"
             f"{signal_event.symbol}|"
             f"{signal_event.signal_type}|"
             f"{notes}\n"
         )
+        self._signal_buf.append(log_line)
+        if len(self._signal_buf) >= LOG_FLUSH_THRESHOLD:
+            self._flush_signals()
+
+    def _flush_trades(self) -> None:
+        with open(self.trade_log_path, 'ab') as f:
+            np.array(self._trade_buf, dtype=TRADE_DTYPE).tofile(f)
+        self._trade_buf.clear()
+
+    def _flush_signals(self) -> None:
         with open(self.signal_log_path, 'a') as f:
-            f.write(log_line)
+            f.writelines(self._signal_buf)
+        self._signal_buf.clear()
+
+    def flush(self) -> None:
+        """ Appends all buffered records and lines to the trade and signal logs. """
+        self._flush_trades()
+        self._flush_signals()
 # engine_components.py (continued)
-import random
+
+def _bar_draws(key: np.uint64, bar_indices) -> np.ndarray:
+    """
+    Uniform [0, 1) float32 draws, one per bar index, from a SplitMix64 hash of
+    (key, bar index). Each bar's draw depends only on the key and its own index,
+    so no bar count or generator state is needed up front.
+    """
+    with np.errstate(over='ignore'):
+        z = key + (np.asarray(bar_indices, dtype=np.uint64) + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(40)).astype(np.float32) * np.float32(2.0 ** -24)
 
 class ExecutionHandler:
     """
@@ -132,32 +303,43 @@ class ExecutionHandler:
     It takes OrderEvents and produces FillEvents, incorporating costs
     like commission and slippage.
     """
-    def __init__(self, commission_rate: float = 0.001, slippage_pct: float = 0.0005):
+    def __init__(self, commission_rate: float = 0.001, slippage_pct: float = 0.0005,
+                 seed: int | None = None):
         """
         Initializes the handler with a commission rate and slippage model.
         :param commission_rate: A fractional commission per trade (e.g., 0.001 for 0.1%).
         :param slippage_pct: A fractional slippage percentage.
+        :param seed: Seed for the per-bar slippage draws, for reproducible backtests.
         """
         self.commission_rate = commission_rate
         self.slippage_pct = slippage_pct
+        self._slip_key = np.random.SeedSequence(seed).generate_state(1, dtype=np.uint64)[0]
         print(f"ExecutionHandler initialized with Commission: {self.commission_rate*100:.3f}%, Slippage: {self.slippage_pct*100:.3f}%")
 
-    def execute_order(self, order_event: OrderEvent, latest_bar_data) -> None:
+    def slippage_draws(self, bar_indices: np.ndarray) -> np.ndarray:
+        """
+        Returns the uniform [0, 1) slippage draws for the given bars, computed
+        for the whole array in one pass.
+        """
+        return _bar_draws(self._slip_key, bar_indices)
+
+    def execute_order(self, order_event: OrderEvent, latest_bar_data: Bar, bar_index: int) -> None:
         """
         Takes an OrderEvent and simulates its execution.
         Puts a FillEvent onto the event queue.
+        :param bar_index: Position of the bar in the data, which keys its slippage draw.
         """
         # --- Slippage Simulation ---
         # Slippage is the difference between the expected price and the actual fill price.
         # We simulate it as a random percentage of the closing price.
         # For a BUY order, slippage is positive (we pay more).
         # For a SELL order, slippage is negative (we get less).
-        if order_event.direction == 'BUY':
-            slippage = latest_bar_data['Close'] * self.slippage_pct * random.random()
-        else: # SELL
-            slippage = -latest_bar_data['Close'] * self.slippage_pct * random.random()
+        draw = _bar_draws(self._slip_key, bar_index)
+        sign = 1 if order_event.direction == 'BUY' else -1
+        close = float(latest_bar_data.close)
+        slippage = close * self.slippage_pct * float(draw) * sign
         
-        fill_price = latest_bar_data['Close'] + slippage
+        fill_price = close + slippage
 
         # --- Commission Calculation ---
         commission = fill_price * order_event.quantity * self.commission_rate
@@ -165,7 +347,7 @@ class ExecutionHandler:
         # --- Create the Fill Event ---
         # The fill occurs at the same timestamp as the market data bar that triggered it.
         fill_event = FillEvent(
-            timestamp=latest_bar_data.name, # .name gives the index (timestamp) of the Series
+            timestamp=latest_bar_data.timestamp,
             symbol=order_event.symbol,
             direction=order_event.direction,
             quantity=order_event.quantity,
@@ -174,5 +356,6 @@ class ExecutionHandler:
         )
         
         # Put the new FillEvent onto the queue for the Portfolio to process
-        event_queue.put(fill_event)
-        print(f"ExecutionHandler generated FILL: {order_event.direction} {order_event.quantity} {order_event.symbol} at ~{fill_price:.2f}")
\ No newline at end of file
+        event_queue.append(fill_event)
+        log.debug("ExecutionHandler generated FILL: %s %s %s at ~%.2f",
+                  order_event.direction, order_event.quantity, order_event.symbol, fill_price)
\ No newline at end of file
@@ -1,39 +1,87 @@
 # event_system.py
-import queue
+import collections
+
+# Integer signal codes used by the vectorized driver, where a strategy
+# returns one code per bar instead of emitting SignalEvent objects.
+SIGNAL_NONE, SIGNAL_LONG, SIGNAL_SHORT, SIGNAL_EXIT = 0, 1, -1, 2
+SIGNAL_NAMES = {SIGNAL_LONG: 'LONG', SIGNAL_SHORT: 'SHORT', SIGNAL_EXIT: 'EXIT'}
+
+# Column order of the OHLCV arrays handed to strategies (per bar and in batch).
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
 
 class Event:
     """
     Base class for all event objects.
+    Events declare __slots__, so instances carry no per-object __dict__.
+    The event type is a class attribute, so it costs no slot or write per instance.
     """
-    pass
+    __slots__ = ()
 
 class MarketEvent(Event):
     """
     Handles the event of receiving a new market update (a new bar).
-    It contains no data itself but signals the system that new data is available.
+    It carries the bar's timestamp and data so handlers need no other context.
     """
-    def __init__(self):
-        self.type = 'MARKET'
+    __slots__ = ('timestamp', 'bar_data')
+    type = 'MARKET'
+
+    def __init__(self, timestamp, bar_data):
+        self.timestamp = timestamp
+        self.bar_data = bar_data
 
 class SignalEvent(Event):
     """
     Handles the event of a Strategy object generating a signal.
     It contains the symbol, timestamp, signal direction, and strength.
+    Instances are deliberately mutable: SignalRing and strategies reuse them.
     """
+    __slots__ = ('symbol', 'timestamp', 'signal_type', 'strength')
+    type = 'SIGNAL'
+
     def __init__(self, symbol, timestamp, signal_type, strength=1.0):
-        self.type = 'SIGNAL'
         self.symbol = symbol
         self.timestamp = timestamp
         self.signal_type = signal_type  # 'LONG', 'SHORT', 'EXIT'
         self.strength = strength
 
+class SignalEventView(Event):
+    """
+    A read-only stand-in for a SignalEvent over one entry of an int8 signal
+    code array, as returned by calculate_signals_batch(). The signal stays a
+    single byte in the array; its fields are only looked up when read.
+    """
+    __slots__ = ('_codes', '_timestamps', '_index', 'symbol')
+    type = 'SIGNAL'
+    strength = 1.0
+
+    def __init__(self, codes, timestamps, index, symbol):
+        """
+        :param codes: The int8 signal code array (see SIGNAL_NAMES).
+        :param timestamps: The bar timestamps, aligned with codes.
+        :param index: The bar this view refers to.
+        """
+        self._codes = codes
+        self._timestamps = timestamps
+        self._index = index
+        self.symbol = symbol
+
+    @property
+    def timestamp(self):
+        return self._timestamps[self._index]
+
+    @property
+    def signal_type(self) -> str:
+        return SIGNAL_NAMES[self._codes[self._index]]
+
 class OrderEvent(Event):
     """
     Handles the event of sending an Order to an execution system.
     The order contains the symbol, order type, quantity, and direction.
     """
+    __slots__ = ('symbol', 'order_type', 'quantity', 'direction')
+    type = 'ORDER'
+
     def __init__(self, symbol, order_type, quantity, direction):
-        self.type = 'ORDER'
         self.symbol = symbol
         self.order_type = order_type    # 'MKT' (Market) or 'LMT' (Limit)
         self.quantity = quantity
@@ -45,8 +93,10 @@ class FillEvent(Event):
     Stores the quantity of an instrument actually filled and at what price.
     Furthermore, it stores the commission of the trade from the brokerage.
     """
+    __slots__ = ('timestamp', 'symbol', 'direction', 'quantity', 'fill_price', 'commission')
+    type = 'FILL'
+
     def __init__(self, timestamp, symbol, direction, quantity, fill_price, commission):
-        self.type = 'FILL'
         self.timestamp = timestamp
         self.symbol = symbol
         self.direction = direction
@@ -54,6 +104,46 @@ class FillEvent(Event):
         self.fill_price = fill_price
         self.commission = commission
 
+class SignalRing:
+    """
+    A fixed ring of preallocated SignalEvent slots, so emitting a signal fills
+    an existing object instead of allocating a new one.
+
+    A strategy takes a slot with fill() and keeps it in its own pending list;
+    the engine calls the strategy's flush_signals() at the end of the bar,
+    which hands the bar's signals to the event queue in one go.
+
+    A slot is overwritten after `capacity` further signals, so consumers must
+    copy out what they need rather than keep the SignalEvent itself (the
+    Portfolio and LoggingHandler already do). The queue is drained every bar,
+    so the capacity only has to cover the signals of a single bar.
+    """
+    def __init__(self, capacity: int = 1024):
+        """
+        :param capacity: Number of slots; must be a power of two.
+        """
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"SignalRing capacity must be a power of two, got {capacity}")
+        self._slots = [SignalEvent(None, None, None) for _ in range(capacity)]
+        self._mask = capacity - 1
+        self._head = 0
+
+    def fill(self, symbol, timestamp, signal_type, strength=1.0) -> SignalEvent:
+        """
+        Fills the next slot and returns it, without queueing it.
+        """
+        signal = self._slots[self._head & self._mask]
+        self._head += 1
+        signal.symbol = symbol
+        signal.timestamp = timestamp
+        signal.signal_type = signal_type
+        signal.strength = strength
+        return signal
+
 # The central event bus for the entire system.
-# Components will put events here and other components will pull them out.
-event_queue = queue.Queue()
\ No newline at end of file
+# Components will append events here and other components will pop them off the left.
+# The engine is single-threaded, so a plain deque is used instead of the locking queue.Queue.
+event_queue = collections.deque()
+
+# Strategies fill their signals from this ring rather than constructing SignalEvents.
+signal_ring = SignalRing()
\ No newline at end of file
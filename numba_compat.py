@@ -0,0 +1,17 @@
+# numba_compat.py
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    print("Warning: numba is not installed. JIT-compiled kernels will run as plain Python.")
+    print("Please run: pip install numba")
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        Stand-in for numba.njit that returns the function unchanged, so kernels
+        decorated with either @njit or @njit(...) still import and run.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
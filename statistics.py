@@ -1,4 +1,5 @@
 # statistics.py
+import os
 import pandas as pd
 import numpy as np
 try:
@@ -8,37 +9,120 @@ except ImportError:
     print("Please run: pip install mplfinance")
     mpf = None
 
+from numba_compat import njit, NUMBA_AVAILABLE
+from engine_components import TRADE_DTYPE, TRADE_BUY, TRADE_SELL
+
+# Charts are display-only; longer price histories are resampled down to about
+# this many candles before plotting.
+MAX_PLOT_BARS = 2000
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _build_equity(n, bar_idx, trade_px, trade_qty, trade_comm, trade_side, initial_capital):
+    """
+    Adds each trade as a cash and quantity delta on its bar (bar_idx, which may
+    repeat) and returns the per-bar cash and holdings-quantity arrays for n bars.
+    """
+    cash_delta = np.zeros(n)
+    qty_delta = np.zeros(n)
+    for k in range(bar_idx.size):
+        i = bar_idx[k]
+        if i >= n:
+            continue
+        notional = trade_px[k] * trade_qty[k]
+        if trade_side[k] == TRADE_BUY:
+            cash_delta[i] -= notional + trade_comm[k]
+            qty_delta[i] += trade_qty[k]
+        elif trade_side[k] == TRADE_SELL:
+            cash_delta[i] += notional - trade_comm[k]
+            qty_delta[i] -= trade_qty[k]
+    return initial_capital + np.cumsum(cash_delta), np.cumsum(qty_delta)
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _max_drawdown(equity):
+    """
+    Single pass over the equity curve. Returns the largest peak-to-trough drop
+    (as a negative number) and the running peak at the point it occurred.
+    """
+    peak = equity[0]
+    max_dd = 0.0
+    peak_at_max_dd = peak
+    for x in equity:
+        if x > peak:
+            peak = x
+        dd = x - peak
+        if dd < max_dd:
+            max_dd = dd
+            peak_at_max_dd = peak
+    return max_dd, peak_at_max_dd
+
+def _mean_std(x: np.ndarray) -> tuple[float, float]:
+    """
+    Mean and sample standard deviation (ddof=1, as pandas) from one sum and one
+    sum of squares, instead of separate mean() and std() passes.
+    """
+    n = x.size
+    if n < 2:
+        return (float(x[0]) if n else 0.0), 0.0
+    total = x.sum()
+    mean = total / n
+    var = (np.dot(x, x) - total * mean) / (n - 1)
+    return mean, np.sqrt(max(var, 0.0)) # rounding can leave var a hair below zero
+
 class Statistics:
     """
     The Statistics class calculates a comprehensive set of performance metrics
     from a completed backtest.
     """
     def __init__(self, trades_log_path: str, portfolio, data_handler, risk_free_rate: float = 0.04):
-        self.trades = pd.read_csv(trades_log_path, sep='|', index_col='Execution_Timestamp', parse_dates=True)
+        self._trade_records = self._read_trade_log(trades_log_path)
+        self.trades = pd.DataFrame({
+            'Symbol': self._trade_records['sym'].astype(str),
+            'Action': np.where(self._trade_records['dir'] == TRADE_BUY, 'BUY', 'SELL'),
+            'Quantity': self._trade_records['qty'],
+            'Price': self._trade_records['px'],
+            'Commission': self._trade_records['comm'],
+        }, index=pd.DatetimeIndex(self._trade_records['ts'].astype('datetime64[ns]'), name='Execution_Timestamp'))
         self.portfolio = portfolio
         self.initial_capital = portfolio.initial_capital
         self.risk_free_rate = risk_free_rate
         self.full_price_data = data_handler.data
         self.equity_curve = self._calculate_equity_curve()
         self.returns = self.equity_curve['Total_Equity'].pct_change().dropna()
+        self._return_stats_cache = None
+
+    @staticmethod
+    def _read_trade_log(trades_log_path: str) -> np.ndarray:
+        """
+        Memory-maps the binary trade log written by LoggingHandler as an array of
+        TRADE_DTYPE records: no text parsing and no copy of the file.
+        """
+        if os.path.getsize(trades_log_path) == 0:
+            return np.empty(0, dtype=TRADE_DTYPE) # np.memmap cannot map an empty file
+        return np.memmap(trades_log_path, dtype=TRADE_DTYPE, mode='r')
 
     def _calculate_equity_curve(self) -> pd.DataFrame:
+        """
+        Builds the per-bar Cash / Holdings / Equity curve. Each trade becomes a
+        cash and quantity delta on the bar it executed (see _build_equity), and a
+        cumulative sum carries those deltas forward to every later bar.
+        """
         curve = self.full_price_data.copy()
-        curve['Cash'] = self.initial_capital
-        curve['Holdings_Value'] = 0.0
-        holdings = 0.0
-        for timestamp, trade in self.trades.iterrows():
-            trade_time = timestamp.floor('D')
-            trade_cost = (trade['Price'] * trade['Quantity']) + trade['Commission']
-            if trade['Action'] == 'BUY':
-                curve.loc[curve.index >= trade_time, 'Cash'] -= trade_cost
-                holdings += trade['Quantity']
-            elif trade['Action'] == 'SELL':
-                curve.loc[curve.index >= trade_time, 'Cash'] += trade_cost
-                holdings -= trade['Quantity']
-            curve.loc[curve.index >= trade_time, 'Holdings_Qty'] = holdings
-        if 'Holdings_Qty' not in curve.columns:
-            curve['Holdings_Qty'] = 0.0
+        records = self._trade_records
+        # The index is sorted, so a binary search finds each trade's bar:
+        # O(T log N) rather than comparing every trade against every bar.
+        bar_idx = curve.index.searchsorted(self.trades.index.floor('D'))
+        cash, qty = _build_equity(
+            len(curve),
+            bar_idx.astype(np.int64),
+            np.ascontiguousarray(records['px']),
+            records['qty'].astype(np.float64),
+            np.ascontiguousarray(records['comm']),
+            np.ascontiguousarray(records['dir']),
+            float(self.initial_capital)
+        )
+        curve['Cash'] = cash
+        curve['Holdings_Qty'] = qty
+        # Close is float32; multiplying by the float64 quantity keeps equity in float64.
         curve['Holdings_Value'] = curve['Holdings_Qty'] * curve['Close']
         curve['Total_Equity'] = curve['Cash'] + curve['Holdings_Value']
         return curve
@@ -46,7 +130,7 @@ class Statistics:
     def generate_report(self) -> dict:
         final_equity = self.equity_curve['Total_Equity'].iloc[-1]
         total_pnl = final_equity - self.initial_capital
-        buy_hold_return = (self.full_price_data['Close'].iloc[-1] / self.full_price_data['Close'].iloc[0] - 1) * self.initial_capital
+        buy_hold_return = (float(self.full_price_data['Close'].iloc[-1]) / float(self.full_price_data['Close'].iloc[0]) - 1) * self.initial_capital
         gross_profit, gross_loss, winning_trades, losing_trades = 0.0, 0.0, 0, 0
         profit_factor = float('inf') if gross_loss == 0 else abs(gross_profit / gross_loss)
         total_closed_trades = winning_trades + losing_trades
@@ -66,51 +150,102 @@ class Statistics:
         return report
 
     def calculate_max_drawdown(self) -> tuple[float, float]:
-        roll_max = self.equity_curve['Total_Equity'].cummax()
-        drawdown = self.equity_curve['Total_Equity'] - roll_max
-        max_drawdown_val = drawdown.min()
-        max_dd_pct = (max_drawdown_val / roll_max[drawdown.idxmin()]) if roll_max[drawdown.idxmin()] != 0 else 0
+        equity = self.equity_curve['Total_Equity'].to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE:
+            max_drawdown_val, peak = _max_drawdown(equity)
+            max_dd_pct = (max_drawdown_val / peak) if peak != 0 else 0
+            return max_drawdown_val, max_dd_pct
+        # Without numba: running peak via np.maximum.accumulate on the raw array.
+        roll_max = np.maximum.accumulate(equity)
+        drawdown = np.empty_like(equity)
+        np.subtract(equity, roll_max, out=drawdown)
+        idx = drawdown.argmin()
+        max_drawdown_val = drawdown[idx]
+        max_dd_pct = (max_drawdown_val / roll_max[idx]) if roll_max[idx] != 0 else 0
         return max_drawdown_val, max_dd_pct
 
+    def _return_stats(self) -> tuple[float, float, float]:
+        """
+        Mean and standard deviation of the returns, and the standard deviation of
+        the negative returns. Computed once and shared by Sharpe and Sortino.
+        """
+        if self._return_stats_cache is None:
+            r = self.returns.to_numpy(dtype=np.float64)
+            mean, std = _mean_std(r)
+            _, downside_std = _mean_std(r[r < 0])
+            self._return_stats_cache = (mean, std, downside_std)
+        return self._return_stats_cache
+
     def calculate_sharpe_ratio(self) -> float:
-        if self.returns.empty or self.returns.std() == 0: return 0.0
-        excess_returns = self.returns - (self.risk_free_rate / 252)
-        return np.sqrt(252) * (excess_returns.mean() / excess_returns.std())
+        if self.returns.empty: return 0.0
+        mean, std, _ = self._return_stats()
+        if std == 0: return 0.0
+        # Subtracting a constant risk-free rate shifts the mean but leaves the std unchanged.
+        return np.sqrt(252) * ((mean - self.risk_free_rate / 252) / std)
 
     def calculate_sortino_ratio(self) -> float:
         if self.returns.empty: return 0.0
-        downside_returns = self.returns[self.returns < 0]
-        if downside_returns.empty or downside_returns.std() == 0: return 0.0
-        expected_return = self.returns.mean()
-        downside_std = downside_returns.std()
+        expected_return, _, downside_std = self._return_stats()
+        if downside_std == 0: return 0.0
         return np.sqrt(252) * (expected_return - (self.risk_free_rate / 252)) / downside_std
         
+    def _plot_data(self) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        The OHLCV bars and equity curve to draw. Histories longer than
+        MAX_PLOT_BARS are resampled into fixed-width time bins (open first, high
+        max, low min, close last, volume summed) so the charts stay light.
+        """
+        prices = self.full_price_data
+        equity = self.equity_curve['Total_Equity']
+        if len(prices) <= MAX_PLOT_BARS:
+            return prices, equity
+        # Split the time span into MAX_PLOT_BARS bins, rounded up to a whole minute, hour or day.
+        step = (prices.index[-1] - prices.index[0]) / MAX_PLOT_BARS
+        unit = 'min' if step < pd.Timedelta(hours=1) else 'h' if step < pd.Timedelta(days=1) else 'D'
+        freq = max(step.ceil(unit), pd.Timedelta(1, unit=unit))
+        plot_df = prices.resample(freq).agg(
+            {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+        ).dropna(subset=['Close'])
+        return plot_df, equity.resample(freq).last().reindex(plot_df.index)
+
+    @staticmethod
+    def _trade_markers(prices: pd.DataFrame, trades: pd.DataFrame, price_col: str, offset: float) -> np.ndarray:
+        """
+        Marker y-values aligned with the bars in `prices`: price_col * offset on
+        the bar containing each trade in `trades`, NaN elsewhere. The bar is found
+        by binary search, so this also works on resampled bars.
+        """
+        markers = np.full(len(prices), np.nan)
+        idx = prices.index.searchsorted(trades.index, side='right') - 1
+        idx = idx[idx >= 0]
+        markers[idx] = prices[price_col].to_numpy()[idx] * offset
+        return markers
+
     def plot_advanced_charts(self, output_path: str, title: str = 'Backtest Analysis'):
         if mpf is None: return
+        plot_df, equity = self._plot_data()
 
         # Start with the equity curve plot, which is always present
         addplots = [
-            mpf.make_addplot(self.equity_curve['Total_Equity'], panel=1, color='royalblue', ylabel='Equity (₹)')
+            mpf.make_addplot(equity, panel=1, color='royalblue', ylabel='Equity (₹)')
         ]
 
         # --- CONDITIONAL PLOTTING FOR BUY MARKERS ---
         buy_trades = self.trades[self.trades['Action'] == 'BUY']
         if not buy_trades.empty:
-            buy_markers = pd.Series(np.nan, index=self.full_price_data.index)
-            buy_markers.loc[buy_trades.index] = self.full_price_data.loc[buy_trades.index]['Low'] * 0.98
+            buy_markers = self._trade_markers(plot_df, buy_trades, 'Low', 0.98)
             addplots.append(mpf.make_addplot(buy_markers, type='scatter', marker='^', color='lime', markersize=100, panel=0))
 
         # --- CONDITIONAL PLOTTING FOR SELL MARKERS ---
         sell_trades = self.trades[self.trades['Action'] == 'SELL']
         if not sell_trades.empty:
-            sell_markers = pd.Series(np.nan, index=self.full_price_data.index)
-            sell_markers.loc[sell_trades.index] = self.full_price_data.loc[sell_trades.index]['High'] * 1.02
+            sell_markers = self._trade_markers(plot_df, sell_trades, 'High', 1.02)
             addplots.append(mpf.make_addplot(sell_markers, type='scatter', marker='v', color='red', markersize=100, panel=0))
         
         mpf.plot(
-            self.full_price_data, type='candle', style='yahoo', title=title,
+            plot_df, type='candle', style='yahoo', title=title,
             ylabel='Price (₹)', addplot=addplots, panel_ratios=(3, 1),
-            figscale=1.5, warn_too_much_data=len(self.full_price_data) + 1,
+            figscale=1.5, warn_too_much_data=len(plot_df) + 1,
             savefig=dict(fname=output_path, dpi=300)
         )
         print(f"Advanced analysis chart saved to: {output_path}")
@@ -123,11 +258,12 @@ class Statistics:
         try:
             import plotly.graph_objects as go
 
-            fig = go.Figure(data=[go.Candlestick(x=self.full_price_data.index,
-                                               open=self.full_price_data['Open'],
-                                               high=self.full_price_data['High'],
-                                               low=self.full_price_data['Low'],
-                                               close=self.full_price_data['Close'],
+            plot_df, _ = self._plot_data()
+            fig = go.Figure(data=[go.Candlestick(x=plot_df.index,
+                                               open=plot_df['Open'],
+                                               high=plot_df['High'],
+                                               low=plot_df['Low'],
+                                               close=plot_df['Close'],
                                                name='Price')])
 
             buy_trades = self.trades[self.trades['Action'] == 'BUY']
@@ -1,15 +1,40 @@
 # strategies/base_strategy.py
-from abc import ABC, abstractmethod
-from event_system import SignalEvent, event_queue
+import numpy as np
+from event_system import event_queue, signal_ring, SIGNAL_NAMES
 
-class BaseStrategy(ABC):
+class BaseStrategy:
     """
-    BaseStrategy is an abstract base class providing an interface for all
-    subsequent strategy handling objects.
+    BaseStrategy is the base class providing an interface for all
+    subsequent strategy handling objects. It is a plain class rather than an
+    ABC, so creating a strategy involves no ABCMeta machinery; a subclass that
+    implements neither _calc() nor calculate_signals() fails with
+    NotImplementedError on its first bar.
 
     The goal of a (derived) Strategy object is to generate Signal objects
     for particular symbols based on the inputs of MarketEvents.
+
+    Numeric strategies implement _calc(), a pure function of one bar that can
+    be compiled with numba (see numba_compat); calculate_signals() then only
+    unpacks the bar's OHLCV array and emits a SignalEvent when _calc() returns
+    a signal.
+    Strategies that need more than the current bar override calculate_signals()
+    instead.
+
+    Signals found while handling a bar are collected in the strategy's own
+    _pending list and handed to the event queue in one go by flush_signals(),
+    which the engine calls at the end of each bar.
+
+    Strategies that only act when the backtest starts can do so in on_start()
+    and set wants_bars = False, and the engine will not call
+    calculate_signals() for every bar.
+
+    Strategies declare __slots__ (with their types annotated on the class), so
+    instances carry no per-object __dict__.
     """
+    __slots__ = ('symbol', 'data_handler', '_pending')
+    wants_bars: bool = True
+    symbol: str
+
     def __init__(self, symbol: str, data_handler):
         """
         Initialize the strategy.
@@ -18,14 +43,72 @@ class BaseStrategy(ABC):
         """
         self.symbol = symbol
         self.data_handler = data_handler
+        self._pending = []
 
-    @abstractmethod
-    def calculate_signals(self, event_timestamp, latest_bar_data) -> None:
+    def on_start(self, first_timestamp: np.datetime64, first_bar) -> None:
+        """
+        Called once by the event loop with the first bar, before any signals
+        are calculated.
+
+        :param first_timestamp: The timestamp of the first market event.
+        :param first_bar: The first bar as an engine_components.Bar.
+        """
+        pass
+
+    @staticmethod
+    def _calc(ts_ns, o, h, l, c, v) -> int:
+        """
+        Computes the signal code (see event_system) for a single bar, or
+        SIGNAL_NONE. Subclasses override it as a static method, typically
+        decorated with @njit(cache=True):
+
+            @staticmethod
+            @njit(cache=True)
+            def _calc(ts_ns, o, h, l, c, v): ...
+
+        :param ts_ns: The bar timestamp in int64 nanoseconds.
+        :param o, h, l, c, v: The bar's open, high, low, close and volume.
+        """
+        raise NotImplementedError("Should implement _calc() or override calculate_signals()")
+
+    def calculate_signals(self, event_timestamp: np.datetime64, ohlcv: np.ndarray) -> None:
         """
         Provides the mechanisms to calculate the list of signals.
         This method is called for each bar of data.
 
         :param event_timestamp: The timestamp of the current market event.
-        :param latest_bar_data: A pandas Series containing the latest bar (OHLCV).
+        :param ohlcv: The latest bar's prices and volume as a float64 array of
+                      shape (5,), in OHLCV_COLUMNS order.
+        """
+        o, h, l, c, v = ohlcv
+        # The index may carry a coarser unit (e.g. datetime64[us]); _calc always gets nanoseconds.
+        code = self._calc(event_timestamp.astype('datetime64[ns]').astype(np.int64), o, h, l, c, v)
+        if code:
+            self._pending.append(signal_ring.fill(self.symbol, event_timestamp, SIGNAL_NAMES[code]))
+
+    def flush_signals(self) -> None:
+        """
+        Moves the signals collected for the current bar onto the event queue.
+        """
+        if self._pending:
+            event_queue.extend(self._pending)
+            self._pending.clear()
+
+    def calculate_signals_batch(self, timestamps: np.ndarray, ohlcv: np.ndarray) -> np.ndarray:
+        """
+        Computes the signals for every bar in one call. Used by the vectorized
+        driver. The default applies _calc() row by row; strategies can override
+        it with a single array pass. Stateful strategies that only implement
+        calculate_signals() have no batch form and must be run with --event-loop.
+
+        :param timestamps: int64 nanosecond timestamps, one per bar.
+        :param ohlcv: A (bars x 5) float64 array with columns in OHLCV_COLUMNS order.
+        :return: An int8 array with one signal code (see event_system) per bar.
         """
-        raise NotImplementedError("Should implement calculate_signals()")
\ No newline at end of file
+        if type(self)._calc is BaseStrategy._calc:
+            raise NotImplementedError(f"{type(self).__name__} has no vectorized signals; run with --event-loop")
+        calc = self._calc
+        signals = np.zeros(len(timestamps), dtype=np.int8)
+        for i, (o, h, l, c, v) in enumerate(ohlcv):
+            signals[i] = calc(timestamps[i], o, h, l, c, v)
+        return signals
\ No newline at end of file
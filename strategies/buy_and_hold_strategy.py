@@ -1,29 +1,71 @@
 # strategies/buy_and_hold_strategy.py
+import logging
+
+import numpy as np
+
 from strategies.base_strategy import BaseStrategy
-from event_system import SignalEvent, event_queue
+from event_system import SignalEvent, event_queue, SIGNAL_LONG
+
+log = logging.getLogger(__name__)
 
 class BuyAndHoldStrategy(BaseStrategy):
     """
     A very simple strategy that buys on the first data bar and holds.
     This serves as a useful benchmark for other strategies.
+
+    The single signal is sent from on_start(), so the engine never has to
+    call calculate_signals() per bar.
     """
+    __slots__ = ('_signal',)
+    wants_bars: bool = False
+    _signal: SignalEvent
+
     def __init__(self, symbol: str, data_handler):
         super().__init__(symbol, data_handler)
-        self.bought = False # A flag to ensure we only buy once
+        # The only signal this strategy ever sends; on_start() just stamps it.
+        self._signal = SignalEvent(symbol=symbol, timestamp=None, signal_type='LONG')
 
-    def calculate_signals(self, event_timestamp, latest_bar_data) -> None:
+    def on_start(self, first_timestamp: np.datetime64, first_bar) -> None:
         """
-        For "Buy and Hold", we generate a single signal on the first bar
-        and then do nothing.
+        Generates the 'LONG' signal on the first bar.
         """
-        if not self.bought:
-            # Generate a 'LONG' signal on the first bar.
-            signal = SignalEvent(
-                symbol=self.symbol,
-                timestamp=event_timestamp,
-                signal_type='LONG'
-            )
-            # Put the signal onto the central event queue
-            event_queue.put(signal)
-            print(f"[{event_timestamp.strftime('%Y-%m-%d')}] Strategy generated SIGNAL: LONG for {self.symbol}")
-            self.bought = True # Set the flag to true
\ No newline at end of file
+        self._signal.timestamp = first_timestamp
+        # Put the signal onto the central event queue
+        event_queue.append(self._signal)
+        log.debug("[%s] Strategy generated SIGNAL: LONG for %s", first_bar.timestamp_str, self.symbol)
+
+    def calculate_signals(self, event_timestamp: np.datetime64, ohlcv: np.ndarray) -> None:
+        """
+        For "Buy and Hold", there is nothing to do after the first bar.
+        """
+        pass
+
+    def calculate_signals_batch(self, timestamps: np.ndarray, ohlcv: np.ndarray) -> np.ndarray:
+        """
+        The whole strategy as an array: LONG on the first bar, nothing after.
+        """
+        signals = np.zeros(len(timestamps), dtype=np.int8)
+        signals[:1] = SIGNAL_LONG # a slice, so an empty history needs no length check
+        return signals
+
+def make_buy_and_hold_strategy(symbol: str, data_handler) -> BuyAndHoldStrategy:
+    """
+    Builds a BuyAndHoldStrategy specialised for one symbol: its on_start() is
+    generated with the prebuilt signal and the queue's append method bound as
+    closure constants, so emitting reads no instance attributes at all.
+    Useful for parameter sweeps that build many fixed configurations.
+    """
+    append = event_queue.append
+
+    class _BuyAndHold(BuyAndHoldStrategy):
+        __slots__ = ()
+
+        def on_start(self, first_timestamp: np.datetime64, first_bar) -> None:
+            signal.timestamp = first_timestamp
+            append(signal)
+            log.debug("[%s] Strategy generated SIGNAL: LONG for %s", first_bar.timestamp_str, symbol)
+
+    _BuyAndHold.__name__ = _BuyAndHold.__qualname__ = f"BuyAndHoldStrategy[{symbol}]"
+    strategy = _BuyAndHold(symbol, data_handler)
+    signal = strategy._signal
+    return strategy
\ No newline at end of file